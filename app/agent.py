@@ -1,32 +1,119 @@
 import json
 import logging
 import re
+import time
 from typing import Any, Dict, Optional
 
+import prefetch
 from config import settings
 from IPython.display import Image
 from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.utils.function_calling import convert_to_openai_tool
 from langchain_openai import ChatOpenAI
 from langgraph.checkpoint.memory import MemorySaver
 from langgraph.graph import END, START, MessagesState, StateGraph
 from langgraph.prebuilt import ToolNode, tools_condition
-from tools import tools
+from llm_cache import LLMResponseCache, cache_key, touches_tools
+from llm_client import RetryBudget, build_http_client, invoke_with_retries, prewarm
+from request_profiler import profiled_thread
+from tools import registry, tools
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+class AgentState(MessagesState):
+    # Provider directory tenant the thread was started for, checkpointed with the thread
+    tenant_id: str
+
+
+def build_llm() -> ChatOpenAI:
+    """Chat model on a shared, pre-warmed connection pool; retries are handled by call_model."""
+    http_client = build_http_client(
+        http2=settings.LLM_HTTP2,
+        max_connections=settings.LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+        connect_timeout=settings.LLM_CONNECT_TIMEOUT_SECONDS,
+        read_timeout=settings.LLM_READ_TIMEOUT_SECONDS,
+    )
+    if settings.LLM_PREWARM_CONNECTIONS > 0:
+        prewarm(
+            http_client,
+            settings.LLM_BASE_URL or "https://api.openai.com/v1",
+            settings.OPENAI_API_KEY,
+            settings.LLM_PREWARM_CONNECTIONS,
+        )
+    return ChatOpenAI(
+        model=settings.MODEL_NAME,
+        temperature=settings.MODEL_TEMPERATURE,
+        base_url=settings.LLM_BASE_URL,
+        http_client=http_client,
+        max_retries=0,
+    )
+
+
+def build_llm_cache() -> Optional[LLMResponseCache]:
+    """Exact-match response cache; only meaningful for deterministic (temperature 0) sampling."""
+    if not settings.LLM_CACHE_ENABLED or settings.MODEL_TEMPERATURE != 0:
+        return None
+    return LLMResponseCache(
+        settings.LLM_CACHE_PATH,
+        max_bytes=settings.LLM_CACHE_MAX_MB * 1024 * 1024,
+        ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+    )
+
+
+llm_cache = build_llm_cache()
+
+
 def build_agent():
     """Agent graph using ReAct pattern."""
-    llm = ChatOpenAI(model=settings.MODEL_NAME, temperature=settings.MODEL_TEMPERATURE)
+    llm = build_llm()
+    timeout = llm.http_client.timeout
     llm_with_tools = llm.bind_tools(tools)
     system_prompt = SystemMessage(content=settings.SYSTEM_PROMPT)
+    retry_budget = RetryBudget(ratio=settings.LLM_RETRY_BUDGET_RATIO)
+    tool_schemas = [convert_to_openai_tool(t) for t in tools]
 
-    def call_model(state: MessagesState):
-        response = llm_with_tools.invoke([system_prompt] + state["messages"])
+    @profiled_thread()
+    def call_model(state: AgentState, config: RunnableConfig):
+        messages = [system_prompt] + state["messages"]
+        key = None
+        if llm_cache is not None:
+            # Booking turns always go to the model so confirmations reflect a real call
+            if touches_tools(messages, settings.LLM_CACHE_BYPASS_TOOLS):
+                llm_cache.bypass()
+            else:
+                key = cache_key(
+                    settings.MODEL_NAME,
+                    settings.MODEL_TEMPERATURE,
+                    tool_schemas,
+                    messages,
+                )
+                cached = llm_cache.get(key)
+                if cached is not None:
+                    return {"messages": [cached]}
+
+        start = time.perf_counter()
+        response = invoke_with_retries(
+            lambda attempt_timeout: llm_with_tools.invoke(
+                messages, timeout=attempt_timeout
+            ),
+            timeout,
+            retry_budget,
+            max_retries=settings.LLM_MAX_RETRIES,
+            backoff_base=settings.LLM_BACKOFF_BASE_SECONDS,
+            backoff_max=settings.LLM_BACKOFF_MAX_SECONDS,
+            deadline=config["configurable"].get("deadline"),
+        )
+        if key is not None and not touches_tools(
+            [response], settings.LLM_CACHE_BYPASS_TOOLS
+        ):
+            llm_cache.put(key, response, time.perf_counter() - start)
         return {"messages": [response]}
 
-    graph = StateGraph(MessagesState)
+    graph = StateGraph(AgentState)
     graph.add_node("model", call_model)
     graph.add_node("tools", ToolNode(tools))
 
@@ -38,9 +125,13 @@ def build_agent():
     memory = MemorySaver()
     agent = graph.compile(checkpointer=memory)
 
-    img = Image(agent.get_graph().draw_mermaid_png())
-    with open("workflow.png", "wb") as f:
-        f.write(img.data)
+    # Rendering goes through the mermaid.ink web API; don't fail startup when offline
+    try:
+        img = Image(agent.get_graph().draw_mermaid_png())
+        with open("workflow.png", "wb") as f:
+            f.write(img.data)
+    except Exception as e:
+        logger.warning(f"Failed to render workflow.png: {e}")
 
     return agent
 
@@ -48,7 +139,18 @@ def build_agent():
 agent = build_agent()
 
 
-def set_patient_context(thread_id: str, data: dict, reset: bool = True) -> bool:
+def thread_config(thread_id: str, tenant_id: Optional[str] = None) -> Dict[str, Any]:
+    """Run config for a thread; the tenant is read from its checkpoint unless given."""
+    config = {"configurable": {"thread_id": thread_id}}
+    if tenant_id is None:
+        tenant_id = agent.get_state(config).values.get("tenant_id")
+    config["configurable"]["tenant_id"] = tenant_id or settings.DEFAULT_TENANT
+    return config
+
+
+def set_patient_context(
+    thread_id: str, data: dict, reset: bool = True, tenant_id: Optional[str] = None
+) -> bool:
     """Inject patient context as a SystemMessage into the given thread. Optionally reset thread first."""
     try:
         config = {"configurable": {"thread_id": thread_id}}
@@ -57,7 +159,10 @@ def set_patient_context(thread_id: str, data: dict, reset: bool = True) -> bool:
         note = {"patient_context": data}
         agent.update_state(
             config,
-            MessagesState(messages=[SystemMessage(content=json.dumps(note))]),
+            AgentState(
+                messages=[SystemMessage(content=json.dumps(note))],
+                tenant_id=tenant_id or settings.DEFAULT_TENANT,
+            ),
         )
         return True
     except Exception as e:
@@ -65,13 +170,75 @@ def set_patient_context(thread_id: str, data: dict, reset: bool = True) -> bool:
         return False
 
 
+def prefetch_referrals(
+    thread_id: str, data: dict, tenant_id: Optional[str] = None
+) -> bool:
+    """Resolve the patient's referred providers in the background so the first turn can skip tool hops."""
+    if not settings.PREFETCH_REFERRALS:
+        return False
+    try:
+        config = thread_config(thread_id, tenant_id)
+        repo = registry.get(config["configurable"]["tenant_id"])
+        return prefetch.schedule(
+            thread_id,
+            repo,
+            data,
+            on_ready=lambda referrals: store_referrals(config, referrals),
+            horizon_days=settings.PREFETCH_HORIZON_DAYS,
+        )
+    except Exception as e:
+        logger.error(
+            f"Failed to schedule referral prefetch for thread {thread_id}: {e}"
+        )
+        return False
+
+
+def store_referrals(config: Dict[str, Any], referrals: Dict[str, Any]) -> bool:
+    """Inject prefetched referral availability as a SystemMessage into the thread."""
+    try:
+        note = {"referral_availability": referrals}
+        agent.update_state(
+            config,
+            MessagesState(messages=[SystemMessage(content=json.dumps(note))]),
+        )
+        return True
+    except Exception as e:
+        thread_id = config["configurable"]["thread_id"]
+        logger.error(f"Failed to apply referral prefetch for thread {thread_id}: {e}")
+        return False
+
+
+def apply_prefetched_referrals(config: Dict[str, Any]) -> bool:
+    """Wait briefly for a referral prefetch still in flight and store it in the thread."""
+    thread_id = config["configurable"]["thread_id"]
+    referrals = prefetch.collect(thread_id, timeout=settings.PREFETCH_TIMEOUT_SECONDS)
+    if referrals is None:
+        return False
+    return store_referrals(config, referrals)
+
+
+def end_session(thread_id: str) -> None:
+    """Drop all state held for a thread (checkpoints and any prefetch in flight)."""
+    try:
+        agent.checkpointer.delete_thread(thread_id)
+    except Exception as e:
+        logger.error(f"Failed to delete thread {thread_id}: {e}")
+    prefetch.discard(thread_id)
+
+
 def run_message(
-    message: str, thread_id: Optional[str] = None, reset: bool = False
+    message: str,
+    thread_id: Optional[str] = None,
+    reset: bool = False,
+    deadline_seconds: Optional[float] = None,
 ) -> Dict[str, Any]:
     if thread_id is None:
         thread_id = "default"
 
-    config = {"configurable": {"thread_id": thread_id}}
+    config = thread_config(thread_id)
+    config["configurable"]["deadline"] = time.monotonic() + (
+        deadline_seconds or settings.LLM_REQUEST_DEADLINE_SECONDS
+    )
 
     # Hard reset thread memory
     if reset:
@@ -80,6 +247,9 @@ def run_message(
             logger.info(f"Reset thread: {thread_id}")
         except Exception as e:
             logger.error(f"Error resetting thread {thread_id}: {e}")
+        prefetch.discard(thread_id)
+    else:
+        apply_prefetched_referrals(config)
 
     initial_state = MessagesState(messages=[HumanMessage(content=message)])
     result = agent.invoke(initial_state, config=config)
@@ -96,8 +266,10 @@ def run_message_stream(
     message: str, thread_id: Optional[str] = None, reset: bool = False
 ):
     result = run_message(message, thread_id, reset)
-    response = result["reply"]
+    yield from stream_reply(result["reply"])
+
 
+def stream_reply(response: str):
     # Simulate streaming for client
     tokens = re.split(r"(\s+)", response)
     for i, token in enumerate(tokens):
@@ -0,0 +1,172 @@
+"""Offline batch processing of care coordination requests.
+
+Streams a JSONL file of {"patient_id", "message", ["id"], ["tenant_id"], ["patient"]}
+records through the agent graph and appends one JSON result per record to the output
+file as each finishes. The output doubles as the progress checkpoint: rerunning the
+same command skips records already written.
+
+Run from the app directory: python batch.py requests.jsonl results.jsonl --concurrency 8
+"""
+
+import argparse
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Set, Tuple
+
+import httpx
+from agent import end_session, prefetch_referrals, run_message, set_patient_context
+from config import settings
+from tools import registry
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def completed_lines(output_path: Path) -> Set[int]:
+    """Input line numbers already present in the output, truncating any partial trailing record."""
+    if not output_path.exists():
+        return set()
+    done = set()
+    valid_bytes = 0
+    with open(output_path, "rb+") as f:
+        for line in f:
+            try:
+                if not line.endswith(b"\n"):
+                    raise ValueError("partial record")
+                done.add(json.loads(line)["line"])
+            except (ValueError, KeyError):
+                logger.warning(f"Discarding partial output after byte {valid_bytes}")
+                break
+            valid_bytes += len(line)
+        f.truncate(valid_bytes)
+    return done
+
+
+def read_records(
+    input_path: Path, skip: Set[int]
+) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+    """Yield (line number, record) pairs lazily; lines that aren't a JSON object yield a None record."""
+    with open(input_path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if line_no in skip or not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                record = None
+            yield line_no, record if isinstance(record, dict) else None
+
+
+def fetch_patient(client: httpx.Client, patient_id: str) -> Dict[str, Any]:
+    r = client.get(f"{settings.CONTEXTUAL_API_URL}/{patient_id}")
+    if r.status_code != 200:
+        raise ValueError("Invalid patient_id or patient not found")
+    return r.json()
+
+
+def process_record(
+    line_no: int,
+    record: Optional[Dict[str, Any]],
+    client: httpx.Client,
+    timeout: float,
+) -> Dict[str, Any]:
+    if record is None:
+        return {"line": line_no, "error": "Malformed JSON record"}
+    result: Dict[str, Any] = {
+        "line": line_no,
+        "id": record.get("id", line_no),
+        "patient_id": record.get("patient_id"),
+    }
+    thread_id = str(uuid.uuid4())
+    start = time.perf_counter()
+    try:
+        tenant_id = record.get("tenant_id") or settings.DEFAULT_TENANT
+        if not registry.exists(tenant_id):
+            raise ValueError("Unknown tenant_id")
+        patient = record.get("patient") or fetch_patient(client, record["patient_id"])
+        if not set_patient_context(thread_id, patient, reset=True, tenant_id=tenant_id):
+            raise RuntimeError("Failed to initialize session context")
+        prefetch_referrals(thread_id, patient, tenant_id=tenant_id)
+        reply = run_message(
+            record["message"], thread_id=thread_id, deadline_seconds=timeout
+        )
+        result["reply"] = reply["reply"]
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        end_session(thread_id)
+    result["elapsed_s"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def run_batch(
+    input_path: Path,
+    output_path: Path,
+    concurrency: int = 8,
+    timeout: float = 120.0,
+    restart: bool = False,
+) -> Dict[str, int]:
+    if restart and output_path.exists():
+        output_path.unlink()
+    done = completed_lines(output_path)
+    if done:
+        logger.info(f"Resuming: {len(done)} records already processed")
+
+    stats = {"ok": 0, "error": 0}
+    write_lock = threading.Lock()
+    # Bound records in flight so the input is never read far ahead of the workers
+    in_flight = threading.BoundedSemaphore(concurrency * 2)
+    start = time.perf_counter()
+
+    with (
+        open(output_path, "a", encoding="utf-8") as out,
+        httpx.Client(timeout=5.0) as client,
+        ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch") as pool,
+    ):
+
+        def on_done(future):
+            try:
+                result = future.result()
+                with write_lock:
+                    out.write(json.dumps(result) + "\n")
+                    out.flush()
+                    stats["error" if "error" in result else "ok"] += 1
+                    total = stats["ok"] + stats["error"]
+                    if total % 100 == 0:
+                        rate = total / (time.perf_counter() - start)
+                        logger.info(f"Processed {total} records ({rate:.1f}/s)")
+            finally:
+                in_flight.release()
+
+        for line_no, record in read_records(input_path, done):
+            in_flight.acquire()
+            future = pool.submit(process_record, line_no, record, client, timeout)
+            future.add_done_callback(on_done)
+
+    logger.info(
+        f"Finished: {stats['ok']} ok, {stats['error']} errors "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Process care coordination requests from a JSONL file"
+    )
+    parser.add_argument("input", type=Path)
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--timeout", type=float, default=120.0, help="Per-record deadline in seconds"
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="Ignore existing output and start over"
+    )
+    args = parser.parse_args()
+    run_batch(args.input, args.output, args.concurrency, args.timeout, args.restart)
@@ -0,0 +1,181 @@
+"""Compare first chat turn latency with and without referral prefetch.
+
+By default this talks to the configured model (OPENAI_API_KEY) and the contextual
+patient API (see docker-compose.yml). With --stub it instead starts a scripted
+OpenAI-compatible server that looks availability up through tool calls unless a
+referral_availability note is present, with a fixed latency per model call, and uses
+a built-in copy of patient 1. The stub always takes the shortcut the note allows, so its
+numbers are a scripted upper bound on the saving (hops skipped x per-call latency), not
+a measurement of how often a real model skips those tool calls.
+Run from the app directory: python benchmarks/first_turn_latency.py --stub --runs 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+MESSAGE = "Book an orthopedics appointment for the patient"
+
+SAMPLE_PATIENT = {
+    "id": 1,
+    "name": "John Doe",
+    "dob": "01/01/1975",
+    "pcp": "Dr. Meredith Grey",
+    "referred_providers": [
+        {"provider": "House, Gregory MD", "specialty": "Orthopedics"},
+        {"specialty": "Primary Care"},
+    ],
+    "appointments": [
+        {
+            "date": "8/12/24",
+            "time": "2:30pm",
+            "provider": "Dr. Gregory House",
+            "status": "completed",
+        },
+    ],
+}
+
+# Tool hops a model typically makes before it can propose an orthopedics slot
+SCRIPTED_TOOL_CALLS = [
+    ("specialty_availability", {"specialty": "Orthopedics"}),
+    ("get_current_date", {}),
+]
+
+
+def make_stub_handler(latency: float):
+    class ScriptedHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, body: dict):
+            data = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._send({"object": "list", "data": []})
+
+        def do_POST(self):
+            request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            messages = request["messages"]
+            prefetched = any(
+                str(m.get("content", "")).startswith('{"referral_availability"')
+                for m in messages
+            )
+            hops = 0
+            for m in reversed(messages):
+                if m["role"] == "user":
+                    break
+                hops += m["role"] == "assistant"
+            time.sleep(latency)
+            message = {"role": "assistant", "content": "Dr. House is available Monday."}
+            if not prefetched and hops < len(SCRIPTED_TOOL_CALLS):
+                name, args = SCRIPTED_TOOL_CALLS[hops]
+                message = {
+                    "role": "assistant",
+                    "content": None,
+                    "tool_calls": [
+                        {
+                            "id": f"call_{uuid.uuid4().hex[:8]}",
+                            "type": "function",
+                            "function": {"name": name, "arguments": json.dumps(args)},
+                        }
+                    ],
+                }
+            self._send(
+                {
+                    "id": "chatcmpl-stub",
+                    "object": "chat.completion",
+                    "created": 0,
+                    "model": request["model"],
+                    "choices": [
+                        {"index": 0, "message": message, "finish_reason": "stop"}
+                    ],
+                    "usage": {
+                        "prompt_tokens": 1,
+                        "completion_tokens": 1,
+                        "total_tokens": 2,
+                    },
+                }
+            )
+
+    return ScriptedHandler
+
+
+def first_turn(data: dict, use_prefetch: bool) -> tuple[float, int]:
+    from agent import (
+        agent,
+        prefetch_referrals,
+        run_message,
+        set_patient_context,
+        thread_config,
+    )
+
+    thread_id = str(uuid.uuid4())
+    set_patient_context(thread_id, data, reset=True)
+    if use_prefetch:
+        prefetch_referrals(thread_id, data)
+    start = time.perf_counter()
+    run_message(MESSAGE, thread_id=thread_id)
+    elapsed = time.perf_counter() - start
+    messages = agent.get_state(thread_config(thread_id)).values["messages"]
+    hops = sum(1 for m in messages if m.type == "ai")
+    return elapsed, hops
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--patient-id", default="1")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--stub", action="store_true")
+    parser.add_argument(
+        "--stub-latency", type=float, default=0.8, help="Seconds per stub model call"
+    )
+    args = parser.parse_args()
+
+    if args.stub:
+        server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), make_stub_handler(args.stub_latency)
+        )
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        # Settings are read when agent is first imported
+        os.environ["LLM_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/v1"
+        os.environ.setdefault("OPENAI_API_KEY", "stub")
+        data = SAMPLE_PATIENT
+    else:
+        from config import settings
+
+        data = httpx.get(f"{settings.CONTEXTUAL_API_URL}/{args.patient_id}").json()
+
+    if args.stub:
+        print("Scripted stub model: results are an upper bound, not a measurement")
+    for use_prefetch in (False, True):
+        samples = [first_turn(data, use_prefetch) for _ in range(args.runs)]
+        latencies = [s[0] for s in samples]
+        hops = [s[1] for s in samples]
+        label = "prefetch" if use_prefetch else "baseline"
+        print(
+            f"{label:>9}: median {statistics.median(latencies):.2f}s "
+            f"max {max(latencies):.2f}s model hops {statistics.mean(hops):.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
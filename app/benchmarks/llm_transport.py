@@ -0,0 +1,186 @@
+"""Tail latency of the default ChatOpenAI transport vs the tuned llm_client transport.
+
+Starts a local OpenAI-compatible stub that adds a per-connection handshake delay,
+stalls a share of completions and fails another share with 503s. The tuned transport
+uses the LLM_* settings (the shipped defaults unless overridden in the environment);
+--read-timeout and --deadline override those two for experiments.
+Run from the app directory: python benchmarks/llm_transport.py --requests 400
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("OPENAI_API_KEY", "stub")
+
+from config import settings  # noqa: E402
+from langchain_core.messages import HumanMessage  # noqa: E402
+from langchain_openai import ChatOpenAI  # noqa: E402
+from llm_client import (  # noqa: E402
+    RetryBudget,
+    build_http_client,
+    invoke_with_retries,
+    prewarm,
+)
+
+logging.getLogger("llm_client").setLevel(logging.ERROR)
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+COMPLETION = {
+    "id": "chatcmpl-stub",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "stub",
+    "choices": [
+        {
+            "index": 0,
+            "message": {"role": "assistant", "content": "Hello!"},
+            "finish_reason": "stop",
+        }
+    ],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+}
+
+
+def make_handler(handshake: float, stall_rate: float, stall: float, error_rate: float):
+    rng = random.Random(0)
+    lock = threading.Lock()
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            # Stand-in for DNS + TLS setup on each new connection
+            time.sleep(handshake)
+            super().setup()
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status: int, body: dict):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            self._send(200, {"object": "list", "data": []})
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            with lock:
+                roll = rng.random()
+            if roll < error_rate:
+                self._send(503, {"error": {"message": "overloaded"}})
+                return
+            if roll < error_rate + stall_rate:
+                time.sleep(stall)
+            self._send(200, COMPLETION)
+
+    return StubHandler
+
+
+def percentile(samples, q):
+    return statistics.quantiles(samples, n=100)[q - 1]
+
+
+def run(label: str, invoke, requests: int, concurrency: int):
+    def one(_):
+        start = time.perf_counter()
+        try:
+            invoke()
+            ok = True
+        except Exception:
+            ok = False
+        return time.perf_counter() - start, ok
+
+    first, _ = one(0)
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(requests)))
+    latencies = [r[0] for r in results]
+    errors = sum(1 for r in results if not r[1])
+    print(
+        f"{label:>7}: first={first * 1000:.0f}ms p50={percentile(latencies, 50) * 1000:.0f}ms "
+        f"p95={percentile(latencies, 95) * 1000:.0f}ms p99={percentile(latencies, 99) * 1000:.0f}ms "
+        f"max={max(latencies) * 1000:.0f}ms errors={errors}/{requests}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--handshake", type=float, default=0.1)
+    parser.add_argument("--stall-rate", type=float, default=0.02)
+    parser.add_argument("--stall", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.03)
+    parser.add_argument(
+        "--read-timeout", type=float, default=settings.LLM_READ_TIMEOUT_SECONDS
+    )
+    parser.add_argument(
+        "--deadline", type=float, default=settings.LLM_REQUEST_DEADLINE_SECONDS
+    )
+    args = parser.parse_args()
+
+    handler = make_handler(args.handshake, args.stall_rate, args.stall, args.error_rate)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}/v1"
+    messages = [HumanMessage(content="Book an orthopedics appointment")]
+
+    default_llm = ChatOpenAI(model="stub", api_key="stub", base_url=base_url)
+    run(
+        "default",
+        lambda: default_llm.invoke(messages),
+        args.requests,
+        args.concurrency,
+    )
+
+    http_client = build_http_client(
+        http2=settings.LLM_HTTP2,
+        max_connections=settings.LLM_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+        connect_timeout=settings.LLM_CONNECT_TIMEOUT_SECONDS,
+        read_timeout=args.read_timeout,
+    )
+    prewarm(http_client, base_url, "stub", settings.LLM_PREWARM_CONNECTIONS)
+    tuned_llm = ChatOpenAI(
+        model="stub",
+        api_key="stub",
+        base_url=base_url,
+        http_client=http_client,
+        max_retries=0,
+    )
+    budget = RetryBudget(ratio=settings.LLM_RETRY_BUDGET_RATIO)
+    run(
+        "tuned",
+        lambda: invoke_with_retries(
+            lambda timeout: tuned_llm.invoke(messages, timeout=timeout),
+            http_client.timeout,
+            budget,
+            max_retries=settings.LLM_MAX_RETRIES,
+            backoff_base=settings.LLM_BACKOFF_BASE_SECONDS,
+            backoff_max=settings.LLM_BACKOFF_MAX_SECONDS,
+            deadline=time.monotonic() + args.deadline,
+        ),
+        args.requests,
+        args.concurrency,
+    )
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
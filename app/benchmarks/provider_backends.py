@@ -0,0 +1,184 @@
+"""Compare startup time, RSS and query latency of the JSON and SQLite provider backends.
+
+Generates a synthetic directory, imports it into SQLite, then measures each backend in a
+fresh subprocess so peak RSS is isolated.
+Run from the app directory: python benchmarks/provider_backends.py --providers 200000
+"""
+
+import argparse
+import json
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from provider_repository import ProviderRepository  # noqa: E402
+from sqlite_provider_repository import (  # noqa: E402
+    SQLiteProviderRepository,
+    import_json,
+)
+
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+SYLLABLES = [
+    "al",
+    "ber",
+    "cor",
+    "dan",
+    "el",
+    "fin",
+    "gar",
+    "hol",
+    "is",
+    "jen",
+    "kel",
+    "lin",
+    "mor",
+    "nor",
+    "os",
+    "per",
+    "quin",
+    "ros",
+    "sul",
+    "tor",
+    "ul",
+    "van",
+    "wes",
+    "yor",
+]
+SPECIALTIES = [f"Specialty {i}" for i in range(200)] + ["Primary Care", "Orthopedics"]
+
+
+def random_name(rng: random.Random) -> str:
+    def word(n):
+        return "".join(rng.choice(SYLLABLES) for _ in range(n)).capitalize()
+
+    return f"{word(rng.randint(2, 3))}, {word(rng.randint(1, 2))}"
+
+
+def generate(path: Path, count: int, seed: int = 0) -> str:
+    """Write a synthetic directory and return the name of a provider in the middle of it."""
+    rng = random.Random(seed)
+    providers = []
+    for i in range(count):
+        providers.append(
+            {
+                "name": random_name(rng),
+                "certification": rng.choice(["MD", "DO", "FNP", "PA"]),
+                "specialty": rng.choice(SPECIALTIES),
+                "departments": [
+                    {
+                        "name": f"Department {rng.randrange(count // 10 + 1)}",
+                        "phone": "(555) 555-0000",
+                        "address": f"{rng.randrange(1000)} Main St",
+                        "days": sorted(
+                            rng.sample(DAYS, rng.randint(1, 5)), key=DAYS.index
+                        ),
+                        "hours": "9am-5pm",
+                    }
+                    for _ in range(rng.randint(1, 3))
+                ],
+            }
+        )
+    path.write_text(json.dumps(providers), encoding="utf-8")
+    return providers[count // 2]["name"]
+
+
+def peak_rss_mb() -> float:
+    # VmHWM is reset on exec, unlike ru_maxrss which is inherited from the parent
+    for line in Path("/proc/self/status").read_text().splitlines():
+        if line.startswith("VmHWM:"):
+            return int(line.split()[1]) / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def timed(fn, *args, repeat: int = 20) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def worker(backend: str, path: Path, name: str):
+    start = time.perf_counter()
+    if backend == "sqlite":
+        repo = SQLiteProviderRepository(path)
+    else:
+        repo = ProviderRepository(path)
+    repo.load()
+    startup = time.perf_counter() - start
+
+    # Drop a character and add a title to force the fuzzy path
+    fuzzy = f"Dr. {name[:3]}{name[4:]}"
+    result = {
+        "backend": backend,
+        "startup_s": startup,
+        "search_by_name_exact_ms": timed(repo.search_by_name, name, repeat=5),
+        "search_by_name_fuzzy_ms": timed(repo.search_by_name, fuzzy, repeat=5),
+        "specialty_availability_ms": timed(
+            repo.get_specialty_availability, "Orthopedics"
+        ),
+        "specialty_availability_on_day_ms": timed(
+            repo.get_specialty_availability_on_day, "Orthopedics", "Tuesday"
+        ),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--providers", type=int, default=100000)
+    parser.add_argument("--worker", choices=["json", "sqlite"])
+    parser.add_argument("--path", type=Path)
+    parser.add_argument("--name")
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.path, args.name)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / "providers.json"
+        db_path = Path(tmp) / "providers.db"
+        name = generate(json_path, args.providers)
+        start = time.perf_counter()
+        import_json(json_path, db_path)
+        print(
+            f"providers={args.providers} import={time.perf_counter() - start:.2f}s "
+            f"json={json_path.stat().st_size / 1e6:.1f}MB db={db_path.stat().st_size / 1e6:.1f}MB"
+        )
+        for backend, path in (("json", json_path), ("sqlite", db_path)):
+            out = subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--worker",
+                    backend,
+                    "--path",
+                    str(path),
+                    "--name",
+                    name,
+                ],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            print(
+                " ".join(
+                    f"{k}={v:.3f}" if isinstance(v, float) else f"{k}={v}"
+                    for k, v in result.items()
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
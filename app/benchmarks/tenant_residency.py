@@ -0,0 +1,87 @@
+"""Memory and first-request latency with many configured tenants but only a few hot ones.
+
+Generates synthetic per-tenant directories, then replays skewed traffic through a
+TenantRegistry. Run from the app directory: python benchmarks/tenant_residency.py --tenants 300
+"""
+
+import argparse
+import logging
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from provider_backends import generate, peak_rss_mb  # noqa: E402
+from tenants import TenantRegistry  # noqa: E402
+
+logging.getLogger("tenants").setLevel(logging.WARNING)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tenants", type=int, default=300)
+    parser.add_argument("--providers", type=int, default=2000)
+    parser.add_argument("--hot", type=int, default=5)
+    parser.add_argument("--hot-share", type=float, default=0.95)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--max-mb", type=int, default=256)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        for i in range(args.tenants):
+            generate(root / f"tenant{i}.json", args.providers, seed=i)
+        registry = TenantRegistry(
+            default_tenant="tenant0",
+            default_path=root / "tenant0.json",
+            root=root,
+            max_bytes=args.max_mb * 1024 * 1024,
+        )
+        all_tenants_mb = sum(
+            registry.estimated_bytes(p) for p in root.glob("*.json")
+        ) / (1024 * 1024)
+        baseline_rss = peak_rss_mb()
+
+        rng = random.Random(0)
+        hot = [f"tenant{i}" for i in range(args.hot)]
+        cold_latencies, warm_latencies = [], []
+        for _ in range(args.requests):
+            if rng.random() < args.hot_share:
+                tenant_id = rng.choice(hot)
+            else:
+                tenant_id = f"tenant{rng.randrange(args.tenants)}"
+            loads = registry.stats["loads"]
+            start = time.perf_counter()
+            registry.get(tenant_id).get_specialty_availability_on_day(
+                "Orthopedics", "Tuesday"
+            )
+            elapsed = (time.perf_counter() - start) * 1000
+            if registry.stats["loads"] > loads:
+                cold_latencies.append(elapsed)
+            else:
+                warm_latencies.append(elapsed)
+
+        print(
+            f"tenants={args.tenants} providers/tenant={args.providers} "
+            f"eager_estimate={all_tenants_mb:.0f}MB budget={args.max_mb}MB"
+        )
+        print(
+            f"resident={len(registry.resident())} stats={registry.stats} "
+            f"peak_rss={peak_rss_mb():.0f}MB (baseline {baseline_rss:.0f}MB)"
+        )
+        print(
+            f"cold first request: n={len(cold_latencies)} "
+            f"median={statistics.median(cold_latencies):.1f}ms max={max(cold_latencies):.1f}ms"
+        )
+        print(
+            f"warm request: n={len(warm_latencies)} "
+            f"median={statistics.median(warm_latencies):.2f}ms max={max(warm_latencies):.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,32 @@
+from pathlib import Path
+from typing import List, Literal, Optional
+
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 
+APP_DIR = Path(__file__).resolve().parent
+
 
 class Settings(BaseSettings):
     MODEL_NAME: str = "gpt-5-nano"
     MODEL_TEMPERATURE: float = 0.0
+    LLM_BASE_URL: Optional[str] = None
+    LLM_HTTP2: bool = True
+    LLM_MAX_CONNECTIONS: int = 64
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 32
+    LLM_CONNECT_TIMEOUT_SECONDS: float = 3.0
+    LLM_READ_TIMEOUT_SECONDS: float = 60.0
+    LLM_MAX_RETRIES: int = 2
+    LLM_RETRY_BUDGET_RATIO: float = 0.1
+    LLM_BACKOFF_BASE_SECONDS: float = 0.25
+    LLM_BACKOFF_MAX_SECONDS: float = 4.0
+    LLM_REQUEST_DEADLINE_SECONDS: float = 120.0
+    LLM_PREWARM_CONNECTIONS: int = 4
+    LLM_CACHE_ENABLED: bool = False
+    LLM_CACHE_PATH: str = "data/llm_cache.db"
+    LLM_CACHE_MAX_MB: int = 256
+    LLM_CACHE_TTL_SECONDS: float = 24 * 60 * 60
+    LLM_CACHE_BYPASS_TOOLS: List[str] = ["book_appointment"]
     SYSTEM_PROMPT: str = """You are a care coordinator assistant, tasked with helping
     a provider/nurse take the correct next steps when helping a patient. You are given
     the relevant patient information and are expected to use the tools provided to
@@ -29,9 +52,38 @@ class Settings(BaseSettings):
             explicitly state the appointment type to the user.
             - An appointment is ESTABLISHED if the patient has been seen the provider in the least 5 years
             - otherwise the appointment type is NEW
+    If a referral_availability note is present, it already contains the resolved referred providers, their
+    availability and upcoming dates (relative to its as_of date), so use it instead of calling the availability tools.
     """
     OPENAI_API_KEY: str
     CONTEXTUAL_API_URL: str = "http://localhost:5000/patient"
+    PROVIDER_BACKEND: Literal["json", "sqlite"] = "json"
+    PROVIDER_DB_PATH: str = "data/providers.db"
+    DEFAULT_TENANT: str = "default"
+    TENANT_DIRECTORY_ROOT: Optional[str] = None
+    TENANT_CACHE_MAX_MB: int = 512
+    TENANT_JSON_MEMORY_FACTOR: float = 12.0
+    PREFETCH_REFERRALS: bool = True
+    PREFETCH_HORIZON_DAYS: int = 14
+    PREFETCH_TIMEOUT_SECONDS: float = 2.0
+    PROFILING_ADMIN_TOKEN: Optional[str] = None
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_INTERVAL_SECONDS: float = 0.005
+    PROFILING_OUTPUT_DIR: str = "profiles"
+    PROFILING_MAX_CAPTURES: int = 200
+
+    @field_validator(
+        "LLM_CACHE_PATH",
+        "PROVIDER_DB_PATH",
+        "TENANT_DIRECTORY_ROOT",
+        "PROFILING_OUTPUT_DIR",
+    )
+    @classmethod
+    def resolve_against_app_dir(cls, value: Optional[str]) -> Optional[str]:
+        """Relative paths are relative to the app directory, not the working directory."""
+        if value is None:
+            return None
+        return str(APP_DIR / value)
 
 
 settings = Settings()
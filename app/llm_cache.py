@@ -0,0 +1,223 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    messages_from_dict,
+    messages_to_dict,
+)
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    latency REAL NOT NULL,
+    created REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access);
+"""
+
+# Hits buffered before their last_access times are written back
+TOUCH_BATCH_SIZE = 64
+
+
+def _normalize(messages: Sequence[BaseMessage]) -> List[Dict[str, Any]]:
+    """Message content without per-run ids; tool call ids become their order of appearance."""
+    call_ids: Dict[str, int] = {}
+
+    def call_id(id_: Optional[str]) -> int:
+        return call_ids.setdefault(id_, len(call_ids))
+
+    normalized = []
+    for m in messages:
+        entry: Dict[str, Any] = {"type": m.type, "content": m.content}
+        for tc in getattr(m, "tool_calls", None) or []:
+            entry.setdefault("tool_calls", []).append(
+                {"name": tc["name"], "args": tc["args"], "id": call_id(tc.get("id"))}
+            )
+        if m.type == "tool":
+            entry["tool_call_id"] = call_id(m.tool_call_id)
+        normalized.append(entry)
+    return normalized
+
+
+def cache_key(
+    model: str,
+    temperature: float,
+    tool_schemas: Sequence[Dict[str, Any]],
+    messages: Sequence[BaseMessage],
+) -> str:
+    """Stable hash of everything that determines a temperature-0 completion."""
+    payload = {
+        "model": model,
+        "temperature": temperature,
+        "tools": list(tool_schemas),
+        "messages": _normalize(messages),
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def touches_tools(messages: Sequence[BaseMessage], tool_names: Sequence[str]) -> bool:
+    """Whether any of the named tools was called since the last human message."""
+    for m in reversed(messages):
+        if m.type == "human":
+            return False
+        if any(tc["name"] in tool_names for tc in getattr(m, "tool_calls", None) or []):
+            return True
+    return False
+
+
+class LLMResponseCache:
+    """Exact-match cache of model responses in a local SQLite file.
+
+    Entries expire after ttl_seconds and the least recently used are evicted once the
+    stored responses exceed max_bytes. Hits only read the database; their access times
+    are buffered and written back in batches, at the latest before the next eviction.
+    The file may be shared by several processes (e.g. the API server and batch.py).
+
+    Storage errors (a locked database, a full disk) are logged and counted rather than
+    raised: a failed lookup is a miss and a failed store is dropped.
+    """
+
+    def __init__(self, path: Path, max_bytes: int, ttl_seconds: float):
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        # key -> last access time not yet written back
+        self._touched: Dict[str, float] = {}
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "stores": 0,
+            "evictions": 0,
+            "saved_seconds": 0.0,
+            "errors": 0,
+        }
+
+    def get(self, key: str) -> Optional[AIMessage]:
+        try:
+            return self._get(key)
+        except Exception as e:
+            self._failed("lookup", e)
+            return None
+
+    def put(self, key: str, message: AIMessage, latency: float):
+        try:
+            self._put(key, message, latency)
+        except Exception as e:
+            self._failed("store", e)
+
+    def _failed(self, operation: str, error: Exception):
+        logger.warning(f"LLM cache {operation} failed: {error}")
+        with self._lock:
+            self.stats["errors"] += 1
+            try:
+                self._conn.rollback()
+            except Exception:
+                pass
+
+    def _get(self, key: str) -> Optional[AIMessage]:
+        start = time.perf_counter()
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, latency, created FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            elapsed = time.perf_counter() - start
+            if row is None or now - row[2] > self.ttl_seconds:
+                if row is not None:
+                    self._touched.pop(key, None)
+                    self._delete(key)
+                    self._conn.commit()
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            self.stats["saved_seconds"] += max(0.0, row[1] - elapsed)
+            self._touched[key] = now
+            if len(self._touched) >= TOUCH_BATCH_SIZE:
+                self._flush_touches()
+                self._conn.commit()
+        message = messages_from_dict(json.loads(row[0]))[0]
+        # A fresh id keeps add_messages from replacing an earlier copy in the same thread
+        message.id = None
+        return message
+
+    def _put(self, key: str, message: AIMessage, latency: float):
+        value = json.dumps(messages_to_dict([message]))
+        now = time.time()
+        with self._lock:
+            self._touched.pop(key, None)
+            self._delete(key)
+            self._conn.execute(
+                "INSERT INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                (key, value, len(value), latency, now, now),
+            )
+            self.stats["stores"] += 1
+            self._flush_touches()
+            self._evict()
+            self._conn.commit()
+
+    def bypass(self):
+        with self._lock:
+            self.stats["bypassed"] += 1
+
+    def _delete(self, key: str) -> int:
+        row = self._conn.execute(
+            "DELETE FROM entries WHERE key = ? RETURNING size", (key,)
+        ).fetchone()
+        return row[0] if row is not None else 0
+
+    def _flush_touches(self):
+        self._conn.executemany(
+            "UPDATE entries SET last_access = MAX(last_access, ?) WHERE key = ?",
+            [(t, key) for key, t in self._touched.items()],
+        )
+        self._touched.clear()
+
+    def _stored_bytes(self) -> int:
+        return self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM entries"
+        ).fetchone()[0]
+
+    def _evict(self):
+        # Sized from the table rather than a counter, since other processes may write too
+        size = self._stored_bytes()
+        if size <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key FROM entries ORDER BY last_access")
+        for (key,) in rows.fetchall():
+            if size <= self.max_bytes:
+                break
+            size -= self._delete(key)
+            self.stats["evictions"] += 1
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = self._conn.execute(
+                "SELECT COUNT(*) FROM entries"
+            ).fetchone()[0]
+            stats["size_bytes"] = self._stored_bytes()
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
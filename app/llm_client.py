@@ -0,0 +1,147 @@
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+import httpx
+import openai
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RETRYABLE_ERRORS = (
+    openai.APIConnectionError,  # includes APITimeoutError
+    openai.RateLimitError,
+    openai.InternalServerError,
+)
+
+
+class RetryBudget:
+    """Token bucket that caps retries to a fraction of overall request volume.
+
+    Each request deposits `ratio` tokens (up to `max_tokens`) and each retry withdraws
+    one, so a struggling upstream sees at most ~ratio extra load instead of every
+    request multiplying into max_retries attempts.
+    """
+
+    def __init__(self, ratio: float = 0.1, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff."""
+    return random.uniform(0, min(cap, base * (2**attempt)))
+
+
+def capped_timeout(timeout: httpx.Timeout, remaining: float) -> httpx.Timeout:
+    def cap(t: Optional[float]) -> float:
+        return remaining if t is None else min(t, remaining)
+
+    return httpx.Timeout(
+        connect=cap(timeout.connect),
+        read=cap(timeout.read),
+        write=cap(timeout.write),
+        pool=cap(timeout.pool),
+    )
+
+
+def invoke_with_retries(
+    call: Callable[[httpx.Timeout], Any],
+    timeout: httpx.Timeout,
+    budget: RetryBudget,
+    max_retries: int,
+    backoff_base: float,
+    backoff_max: float,
+    deadline: Optional[float] = None,
+) -> Any:
+    """Call `call(timeout)` retrying transient errors within the budget and deadline.
+
+    `deadline` is a time.monotonic() timestamp; each attempt's timeouts are capped to
+    the time remaining, and no retry is attempted if its backoff would overrun it.
+    """
+    budget.deposit()
+    attempt = 0
+    while True:
+        attempt_timeout = timeout
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("LLM request deadline exceeded")
+            attempt_timeout = capped_timeout(timeout, remaining)
+        try:
+            return call(attempt_timeout)
+        except RETRYABLE_ERRORS as e:
+            if attempt >= max_retries:
+                raise
+            delay = backoff_delay(attempt, backoff_base, backoff_max)
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                raise
+            if not budget.withdraw():
+                logger.warning("LLM retry budget exhausted, not retrying")
+                raise
+            logger.warning(
+                f"LLM call failed ({type(e).__name__}), retry {attempt + 1} in {delay:.2f}s"
+            )
+            time.sleep(delay)
+            attempt += 1
+
+
+def build_http_client(
+    http2: bool,
+    max_connections: int,
+    max_keepalive_connections: int,
+    connect_timeout: float,
+    read_timeout: float,
+) -> httpx.Client:
+    """Shared connection pool for the LLM API with separate connect and read timeouts."""
+    return httpx.Client(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        ),
+        timeout=httpx.Timeout(
+            connect=connect_timeout,
+            read=read_timeout,
+            write=read_timeout,
+            pool=connect_timeout,
+        ),
+    )
+
+
+def prewarm(client: httpx.Client, base_url: str, api_key: str, connections: int) -> int:
+    """Open pooled connections (DNS, TCP and TLS) ahead of the first request.
+
+    Returns the number of warm-up requests that reached the server.
+    """
+    url = f"{base_url.rstrip('/')}/models"
+    headers = {"Authorization": f"Bearer {api_key}"}
+
+    def warm(_):
+        try:
+            client.get(url, headers=headers)
+            return True
+        except httpx.HTTPError as e:
+            logger.warning(f"LLM connection pre-warm failed: {e}")
+            return False
+
+    with ThreadPoolExecutor(max_workers=connections) as pool:
+        warmed = sum(pool.map(warm, range(connections)))
+    logger.info(f"Pre-warmed {warmed}/{connections} LLM connections")
+    return warmed
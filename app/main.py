@@ -1,12 +1,27 @@
 import json
 import uuid
+from typing import Optional
 
 import httpx
-from agent import run_message_stream, set_patient_context
+from agent import (
+    llm_cache,
+    prefetch_referrals,
+    run_message,
+    set_patient_context,
+    stream_reply,
+)
 from config import settings
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import FileResponse, StreamingResponse
 from models import ChatRequest, SessionStartRequest, SessionStartResponse
+from request_profiler import (
+    capture_path,
+    list_captures,
+    profile,
+    should_profile,
+    token_matches,
+)
+from tools import registry
 
 app = FastAPI(title="Care Coordinator Assistant API")
 
@@ -16,9 +31,38 @@ def healthcheck():
     return {"status": "ok"}
 
 
+def _profile(label: str, token: Optional[str]):
+    enabled = should_profile(
+        token, settings.PROFILING_ADMIN_TOKEN, settings.PROFILING_SAMPLE_RATE
+    )
+    return profile(
+        label,
+        enabled,
+        settings.PROFILING_OUTPUT_DIR,
+        interval=settings.PROFILING_INTERVAL_SECONDS,
+        max_captures=settings.PROFILING_MAX_CAPTURES,
+    )
+
+
+def _require_admin(token: Optional[str]):
+    if not token_matches(token, settings.PROFILING_ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+
 @app.post("/api/session/start", response_model=SessionStartResponse)
-def start_session(req: SessionStartRequest):
+def start_session(
+    req: SessionStartRequest, x_profile_token: Optional[str] = Header(default=None)
+):
     """Validate patient_id, seed thread state with patient context, and return a new thread_id."""
+    with _profile("start_session", x_profile_token):
+        return _start_session(req)
+
+
+def _start_session(req: SessionStartRequest) -> SessionStartResponse:
+    tenant_id = req.tenant_id or settings.DEFAULT_TENANT
+    if not registry.exists(tenant_id):
+        raise HTTPException(status_code=400, detail="Unknown tenant_id")
+
     url = f"{settings.CONTEXTUAL_API_URL}/{req.patient_id}"
     try:
         with httpx.Client(timeout=5.0) as client:
@@ -38,27 +82,36 @@ def start_session(req: SessionStartRequest):
         )
 
     thread_id = str(uuid.uuid4())
-    ok = set_patient_context(thread_id, data, reset=True)
+    ok = set_patient_context(thread_id, data, reset=True, tenant_id=tenant_id)
     if not ok:
         raise HTTPException(
             status_code=500, detail="Failed to initialize session context"
         )
+    prefetch_referrals(thread_id, data, tenant_id=tenant_id)
     return SessionStartResponse(
         thread_id=thread_id,
         patient_id=req.patient_id,
         patient_name=data["name"],
+        tenant_id=tenant_id,
     )
 
 
 @app.post("/api/chat/stream")
-def chat_stream(req: ChatRequest):
+def chat_stream(
+    req: ChatRequest, x_profile_token: Optional[str] = Header(default=None)
+):
     """Streaming chat endpoint using Server-Sent Events"""
+    profiler = _profile("chat_stream", x_profile_token)
 
     def generate():
         try:
-            for chunk in run_message_stream(
-                req.message, thread_id=req.thread_id, reset=req.reset
-            ):
+            # Profile only the agent run: each later chunk may be sent from a different
+            # worker thread, which could meanwhile be serving another request
+            with profiler:
+                result = run_message(
+                    req.message, thread_id=req.thread_id, reset=req.reset
+                )
+            for chunk in stream_reply(result["reply"]):
                 # Format as Server-Sent Events
                 yield f"data: {json.dumps({'content': chunk})}\n\n"
         except Exception as e:
@@ -74,3 +127,30 @@ def chat_stream(req: ChatRequest):
             "Connection": "keep-alive",
         },
     )
+
+
+@app.get("/admin/profiles")
+def list_profiles(x_admin_token: Optional[str] = Header(default=None)):
+    """List captured request profiles, newest first."""
+    _require_admin(x_admin_token)
+    return {"profiles": list_captures(settings.PROFILING_OUTPUT_DIR)}
+
+
+@app.get("/admin/profiles/{name}")
+def download_profile(name: str, x_admin_token: Optional[str] = Header(default=None)):
+    """Download a captured profile in collapsed-stack format (flamegraph.pl / speedscope)."""
+    _require_admin(x_admin_token)
+    path = capture_path(settings.PROFILING_OUTPUT_DIR, name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=name)
+
+
+@app.get("/admin/metrics")
+def metrics(x_admin_token: Optional[str] = Header(default=None)):
+    """Cache and residency counters for the LLM response cache and tenant directories."""
+    _require_admin(x_admin_token)
+    return {
+        "llm_cache": llm_cache.metrics() if llm_cache is not None else None,
+        "tenants": dict(registry.stats, resident=len(registry.resident())),
+    }
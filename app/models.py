@@ -20,12 +20,14 @@ class Provider(BaseModel):
 
 class SessionStartRequest(BaseModel):
     patient_id: str
+    tenant_id: Optional[str] = None
 
 
 class SessionStartResponse(BaseModel):
     thread_id: str
     patient_id: str
     patient_name: str
+    tenant_id: str
 
 
 class ChatRequest(BaseModel):
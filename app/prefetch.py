@@ -0,0 +1,141 @@
+import contextvars
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from provider_repository import ProviderRepository
+from request_profiler import profiled_thread
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="prefetch")
+# thread_id -> prefetch still in flight; finished results are stored with the thread
+_pending: Dict[str, Future] = {}
+_lock = threading.Lock()
+
+
+def upcoming_dates(days: List[str], start: date, horizon_days: int) -> List[str]:
+    """ISO dates within the horizon (starting tomorrow) that fall on one of the given weekdays."""
+    dates = []
+    for offset in range(1, horizon_days + 1):
+        d = start + timedelta(days=offset)
+        if d.strftime("%A") in days:
+            dates.append(d.isoformat())
+    return dates
+
+
+@profiled_thread()
+def resolve_referrals(
+    repo: ProviderRepository,
+    referrals: List[Dict[str, Any]],
+    start: Optional[date] = None,
+    horizon_days: int = 14,
+) -> Dict[str, Any]:
+    """Resolve a patient's referred_providers against the repository and precompute candidate dates."""
+    start = start or date.today()
+    resolved = []
+    for ref in referrals:
+        entry: Dict[str, Any] = {"referral": ref}
+        provider_name = ref.get("provider")
+        specialty = ref.get("specialty")
+        if provider_name:
+            provider = repo.search_by_name(provider_name)
+            if not provider:
+                entry["error"] = f"Provider '{provider_name}' not found"
+                resolved.append(entry)
+                continue
+            entry["provider"] = provider.name
+            entry["specialty"] = provider.specialty
+            availability = repo.get_provider_availability(provider.name)
+        elif specialty:
+            entry["specialty"] = specialty
+            availability = repo.get_specialty_availability(specialty)
+        else:
+            continue
+        for a in availability:
+            a["upcoming_dates"] = upcoming_dates(
+                a["days_available"], start, horizon_days
+            )
+        entry["availability"] = availability
+        resolved.append(entry)
+    return {"as_of": start.isoformat(), "referrals": resolved}
+
+
+def schedule(
+    thread_id: str,
+    repo: ProviderRepository,
+    data: Dict[str, Any],
+    on_ready: Callable[[Dict[str, Any]], None],
+    horizon_days: int = 14,
+) -> bool:
+    """Start resolving the patient's referrals in the background for the given thread.
+
+    The result is handed to on_ready (which stores it with the thread) as soon as it is
+    ready, unless it was collected or discarded first. Nothing is kept here afterwards.
+    """
+    referrals = data.get("referred_providers") or []
+    if not referrals:
+        return False
+    # Run in a copy of the caller's context so a profiled request also samples this work
+    future = _executor.submit(
+        contextvars.copy_context().run,
+        resolve_referrals,
+        repo,
+        referrals,
+        horizon_days=horizon_days,
+    )
+    with _lock:
+        previous = _pending.pop(thread_id, None)
+        _pending[thread_id] = future
+    if previous is not None:
+        previous.cancel()
+    future.add_done_callback(lambda f: _deliver(thread_id, f, on_ready))
+    return True
+
+
+def _deliver(
+    thread_id: str, future: Future, on_ready: Callable[[Dict[str, Any]], None]
+) -> None:
+    # Holding the lock while storing means collect() either takes the future first
+    # (and stores the result itself) or finds the result already stored
+    with _lock:
+        if _pending.get(thread_id) is not future:
+            return
+        del _pending[thread_id]
+        if future.cancelled():
+            return
+        try:
+            on_ready(future.result())
+        except Exception as e:
+            logger.error(f"Referral prefetch for thread {thread_id} failed: {e}")
+
+
+def collect(thread_id: str, timeout: float = 2.0) -> Optional[Dict[str, Any]]:
+    """Take over a prefetch still in flight for a thread, waiting up to timeout seconds.
+
+    Returns None when nothing is in flight, including when on_ready already stored the result.
+    """
+    with _lock:
+        future = _pending.pop(thread_id, None)
+    if future is None:
+        return None
+    try:
+        return future.result(timeout=timeout)
+    except FutureTimeoutError:
+        logger.warning(f"Referral prefetch for thread {thread_id} timed out")
+        future.cancel()
+    except Exception as e:
+        logger.error(f"Referral prefetch for thread {thread_id} failed: {e}")
+    return None
+
+
+def discard(thread_id: str) -> None:
+    """Drop any prefetch still in flight for a thread (e.g. when the thread is reset)."""
+    with _lock:
+        future = _pending.pop(thread_id, None)
+    if future is not None:
+        future.cancel()
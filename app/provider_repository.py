@@ -6,9 +6,10 @@ import Levenshtein as levenshtein
 
 from models import Department, Provider
 
+
 class ProviderRepository:
-    def __init__(self):
-        self.json_path = Path(__file__).parent / "data" / "providers.json"
+    def __init__(self, json_path: Optional[Path] = None):
+        self.json_path = json_path or Path(__file__).parent / "data" / "providers.json"
         self.providers: List[Provider] = []
 
     def load(self):
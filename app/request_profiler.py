@@ -0,0 +1,192 @@
+import hmac
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CAPTURE_SUFFIX = ".collapsed"
+
+
+class SamplingProfiler:
+    """Samples the stacks of the threads working on one request on a background thread.
+
+    Only threads registered with add_thread() are sampled, so concurrent requests don't
+    show up in each other's captures. Stacks are aggregated in collapsed format
+    (`thread;outer;...;inner count`), which flamegraph.pl and speedscope both read directly.
+    """
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        # thread ident -> nesting depth of add_thread() calls
+        self._threads: Counter = Counter()
+        self._threads_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_thread(self):
+        """Start sampling the calling thread."""
+        with self._threads_lock:
+            self._threads[threading.get_ident()] += 1
+
+    def remove_thread(self):
+        ident = threading.get_ident()
+        with self._threads_lock:
+            self._threads[ident] -= 1
+            if self._threads[ident] <= 0:
+                del self._threads[ident]
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.samples
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            with self._threads_lock:
+                idents = list(self._threads)
+            frames = sys._current_frames()
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident in idents:
+                frame = frames.get(ident)
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(
+                        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                    )
+                    frame = frame.f_back
+                if not stack:
+                    continue
+                stack.append(names.get(ident, str(ident)))
+                self.samples[";".join(reversed(stack))] += 1
+
+
+# Profiler of the request being handled; copied into graph and tool worker threads
+# along with the rest of the context
+_active: ContextVar[Optional[SamplingProfiler]] = ContextVar(
+    "active_profiler", default=None
+)
+
+
+@contextmanager
+def profiled_thread():
+    """Include the current thread in the active request profile, if any, while in the block.
+
+    Also usable as a decorator on functions that run on worker threads.
+    """
+    profiler = _active.get()
+    if profiler is None:
+        yield
+        return
+    profiler.add_thread()
+    try:
+        yield
+    finally:
+        profiler.remove_thread()
+
+
+def token_matches(token: Optional[str], admin_token: Optional[str]) -> bool:
+    """Constant-time check of a request token against the configured admin token."""
+    if not admin_token or token is None:
+        return False
+    return hmac.compare_digest(token.encode("utf-8"), admin_token.encode("utf-8"))
+
+
+def should_profile(
+    token: Optional[str],
+    admin_token: Optional[str],
+    sample_rate: float,
+) -> bool:
+    """Profile when the request carries the admin token, or for a sampled share of traffic."""
+    if token_matches(token, admin_token):
+        return True
+    return sample_rate > 0 and random.random() < sample_rate
+
+
+def write_capture(
+    output_dir: Path, label: str, samples: Counter, max_captures: Optional[int] = None
+) -> Path:
+    """Write a capture, then delete the oldest beyond max_captures (if set)."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    name = f"{time.strftime('%Y%m%dT%H%M%S')}-{label}-{uuid.uuid4().hex[:8]}"
+    path = output_dir / f"{name}{CAPTURE_SUFFIX}"
+    lines = [f"{stack} {count}" for stack, count in samples.most_common()]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    if max_captures is not None:
+        prune_captures(output_dir, max_captures, keep=path)
+    return path
+
+
+def prune_captures(output_dir: Path, max_captures: int, keep: Optional[Path] = None):
+    # Names start with a timestamp, so name order is capture order
+    captures = sorted(p for p in output_dir.glob(f"*{CAPTURE_SUFFIX}") if p != keep)
+    if keep is not None:
+        max_captures -= 1
+    for path in captures[: max(0, len(captures) - max_captures)]:
+        path.unlink(missing_ok=True)
+
+
+@contextmanager
+def profile(
+    label: str,
+    enabled: bool,
+    output_dir: Path,
+    interval: float = 0.005,
+    max_captures: Optional[int] = None,
+):
+    """Capture a sampling profile of the enclosed block when enabled; no-op otherwise.
+
+    The capture covers the calling thread plus worker threads that enter profiled_thread()
+    from a context copied out of the block. The block must run on a single thread, so
+    it must not span a yield in a generator that a server may resume on another thread.
+    """
+    if not enabled:
+        yield
+        return
+    profiler = SamplingProfiler(interval=interval)
+    profiler.add_thread()
+    token = _active.set(profiler)
+    profiler.start()
+    try:
+        yield
+    finally:
+        samples = profiler.stop()
+        _active.reset(token)
+        try:
+            path = write_capture(Path(output_dir), label, samples, max_captures)
+            logger.info(f"Wrote profile capture {path.name}")
+        except Exception as e:
+            logger.error(f"Failed to write profile capture for {label}: {e}")
+
+
+def list_captures(output_dir: Path) -> List[Dict[str, object]]:
+    output_dir = Path(output_dir)
+    if not output_dir.exists():
+        return []
+    captures = sorted(output_dir.glob(f"*{CAPTURE_SUFFIX}"), reverse=True)
+    return [{"name": p.name, "size_bytes": p.stat().st_size} for p in captures]
+
+
+def capture_path(output_dir: Path, name: str) -> Optional[Path]:
+    """Resolve a capture by file name, rejecting anything outside the output directory."""
+    if Path(name).name != name or not name.endswith(CAPTURE_SUFFIX):
+        return None
+    path = Path(output_dir) / name
+    return path if path.is_file() else None
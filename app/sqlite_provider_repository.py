@@ -0,0 +1,286 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import Levenshtein as levenshtein
+
+from models import Department, Provider
+
+SCHEMA = """
+CREATE TABLE providers (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    certification TEXT,
+    specialty TEXT
+);
+CREATE INDEX idx_providers_name_key ON providers (name_key);
+CREATE INDEX idx_providers_specialty ON providers (specialty COLLATE NOCASE);
+
+CREATE TABLE departments (
+    id INTEGER PRIMARY KEY,
+    provider_id INTEGER NOT NULL REFERENCES providers (id),
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    phone TEXT,
+    address TEXT,
+    hours TEXT NOT NULL
+);
+CREATE INDEX idx_departments_provider ON departments (provider_id, position);
+
+CREATE TABLE department_days (
+    department_id INTEGER NOT NULL REFERENCES departments (id),
+    position INTEGER NOT NULL,
+    day TEXT NOT NULL
+);
+CREATE INDEX idx_department_days_department ON department_days (department_id, position);
+CREATE INDEX idx_department_days_day ON department_days (day, department_id);
+
+CREATE VIRTUAL TABLE providers_fts USING fts5(
+    name, content='providers', content_rowid='id', tokenize='trigram'
+);
+"""
+
+# Number of FTS candidates re-ranked by Levenshtein ratio in search_by_name
+FUZZY_CANDIDATES = 50
+
+
+def import_json(json_path: Path, db_path: Path, batch_size: int = 10000) -> int:
+    """One-time bulk import of a providers.json directory into a new SQLite database.
+
+    The database is built in a temporary file next to db_path and moved into place only
+    once complete, so readers never see a partial import.
+    """
+    db_path = Path(db_path)
+    data = json.loads(Path(json_path).read_text(encoding="utf-8"))
+    fd, tmp_name = tempfile.mkstemp(
+        dir=db_path.parent, prefix=f".{db_path.name}.", suffix=".tmp"
+    )
+    os.close(fd)
+    conn = sqlite3.connect(tmp_name)
+    try:
+        conn.executescript(SCHEMA)
+        provider_rows, dept_rows, day_rows = [], [], []
+        dept_id = 0
+        for provider_id, item in enumerate(data, start=1):
+            name = item.get("name", "")
+            provider_rows.append(
+                (
+                    provider_id,
+                    name,
+                    name.strip().lower(),
+                    item.get("certification"),
+                    item.get("specialty"),
+                )
+            )
+            for position, d in enumerate(item.get("departments", [])):
+                dept = Department(**d)
+                dept_id += 1
+                dept_rows.append(
+                    (
+                        dept_id,
+                        provider_id,
+                        position,
+                        dept.name,
+                        dept.phone,
+                        dept.address,
+                        dept.hours,
+                    )
+                )
+                day_rows.extend((dept_id, i, day) for i, day in enumerate(dept.days))
+            if len(provider_rows) >= batch_size:
+                _insert_batch(conn, provider_rows, dept_rows, day_rows)
+                provider_rows, dept_rows, day_rows = [], [], []
+        _insert_batch(conn, provider_rows, dept_rows, day_rows)
+        conn.execute("INSERT INTO providers_fts (providers_fts) VALUES ('rebuild')")
+        conn.commit()
+        conn.execute("ANALYZE")
+        conn.close()
+        os.replace(tmp_name, db_path)
+        return len(data)
+    except BaseException:
+        conn.close()
+        os.unlink(tmp_name)
+        raise
+
+
+def _insert_batch(conn, provider_rows, dept_rows, day_rows):
+    conn.executemany("INSERT INTO providers VALUES (?, ?, ?, ?, ?)", provider_rows)
+    conn.executemany("INSERT INTO departments VALUES (?, ?, ?, ?, ?, ?, ?)", dept_rows)
+    conn.executemany("INSERT INTO department_days VALUES (?, ?, ?)", day_rows)
+
+
+def _trigram_query(name: str) -> Optional[str]:
+    trigrams = set()
+    for token in re.findall(r"[a-z0-9]+", name.lower()):
+        trigrams.update(token[i : i + 3] for i in range(len(token) - 2))
+    if not trigrams:
+        return None
+    return " OR ".join(f'"{t}"' for t in sorted(trigrams))
+
+
+class SQLiteProviderRepository:
+    """ProviderRepository backed by a SQLite database built with import_json."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+
+    def load(self):
+        if not self.db_path.exists():
+            raise FileNotFoundError(
+                f"Provider database {self.db_path} not found; build it with "
+                f"`python sqlite_provider_repository.py <providers.json> {self.db_path}`"
+            )
+        self._connection()
+
+    def _connection(self) -> sqlite3.Connection:
+        # Tools and prefetch run on worker threads, so each thread gets its own read-only connection
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                f"{self.db_path.resolve().as_uri()}?mode=ro", uri=True
+            )
+            self._local.conn = conn
+        return conn
+
+    def _days(self, department_id: int) -> List[str]:
+        rows = self._connection().execute(
+            "SELECT day FROM department_days WHERE department_id = ? ORDER BY position",
+            (department_id,),
+        )
+        return [r[0] for r in rows]
+
+    def _provider(self, row) -> Provider:
+        provider_id, name, certification, specialty = row
+        rows = self._connection().execute(
+            "SELECT id, name, phone, address, hours FROM departments "
+            "WHERE provider_id = ? ORDER BY position",
+            (provider_id,),
+        )
+        depts = [
+            Department(
+                name=d_name,
+                phone=phone,
+                address=address,
+                days=self._days(dept_id),
+                hours=hours,
+            )
+            for dept_id, d_name, phone, address, hours in rows.fetchall()
+        ]
+        return Provider(
+            name=name,
+            certification=certification,
+            specialty=specialty,
+            departments=depts,
+        )
+
+    def search_by_specialty(self, specialty: str) -> List[Provider]:
+        rows = self._connection().execute(
+            "SELECT id, name, certification, specialty FROM providers "
+            "WHERE specialty = ? COLLATE NOCASE ORDER BY id",
+            (specialty.strip(),),
+        )
+        return [self._provider(r) for r in rows.fetchall()]
+
+    def search_by_name(self, name: str) -> Optional[Provider]:
+        conn = self._connection()
+        row = conn.execute(
+            "SELECT id, name, certification, specialty FROM providers "
+            "WHERE name_key = ? ORDER BY id LIMIT 1",
+            (name.strip().lower(),),
+        ).fetchone()
+        if row:
+            return self._provider(row)
+
+        # Narrow candidates via the trigram index, then pick the closest by Levenshtein ratio
+        query = _trigram_query(name)
+        if not query:
+            return None
+        candidates = conn.execute(
+            "SELECT p.id, p.name, p.certification, p.specialty FROM providers_fts "
+            "JOIN providers p ON p.id = providers_fts.rowid "
+            "WHERE providers_fts MATCH ? ORDER BY rank LIMIT ?",
+            (query, FUZZY_CANDIDATES),
+        ).fetchall()
+        if not candidates:
+            return None
+        best = max(candidates, key=lambda r: levenshtein.ratio(name, r[1]))
+        if levenshtein.ratio(name, best[1]) >= 0.4:
+            return self._provider(best)
+        return None
+
+    def get_provider_availability(self, provider_name: str) -> List[Dict[str, Any]]:
+        provider = self.search_by_name(provider_name)
+        if not provider:
+            return []
+        return [
+            {
+                "location": dept.name,
+                "days_available": dept.days,
+                "hours_available": dept.hours,
+            }
+            for dept in provider.departments
+        ]
+
+    def get_specialty_availability(self, specialty: str) -> List[Dict[str, Any]]:
+        rows = self._connection().execute(
+            "SELECT p.name, d.id, d.name, d.hours FROM providers p "
+            "JOIN departments d ON d.provider_id = p.id "
+            "WHERE p.specialty = ? COLLATE NOCASE ORDER BY p.id, d.position",
+            (specialty.strip(),),
+        )
+        return [
+            {
+                "provider": p_name,
+                "location": d_name,
+                "days_available": self._days(dept_id),
+                "hours_available": hours,
+            }
+            for p_name, dept_id, d_name, hours in rows.fetchall()
+        ]
+
+    def get_provider_availability_on_day(
+        self, provider_name: str, day_of_week: str
+    ) -> List[Dict[str, Any]]:
+        provider = self.search_by_name(provider_name)
+        if not provider:
+            return []
+        return [
+            {"location": dept.name, "hours_available": dept.hours}
+            for dept in provider.departments
+            if day_of_week in dept.days
+        ]
+
+    def get_specialty_availability_on_day(
+        self, specialty: str, day_of_week: str
+    ) -> List[Dict[str, Any]]:
+        rows = self._connection().execute(
+            "SELECT p.name, d.name, d.hours FROM department_days dd "
+            "JOIN departments d ON d.id = dd.department_id "
+            "JOIN providers p ON p.id = d.provider_id "
+            "WHERE dd.day = ? AND p.specialty = ? COLLATE NOCASE "
+            "ORDER BY p.id, d.position",
+            (day_of_week, specialty.strip()),
+        )
+        return [
+            {"provider": p_name, "location": d_name, "hours_available": hours}
+            for p_name, d_name, hours in rows.fetchall()
+        ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Bulk import a providers.json directory into SQLite"
+    )
+    parser.add_argument("json_path", type=Path)
+    parser.add_argument("db_path", type=Path)
+    args = parser.parse_args()
+    count = import_json(args.json_path, args.db_path)
+    print(f"Imported {count} providers into {args.db_path}")
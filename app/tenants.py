@@ -0,0 +1,121 @@
+import logging
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+from provider_repository import ProviderRepository
+from sqlite_provider_repository import SQLiteProviderRepository
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+Repository = Union[ProviderRepository, SQLiteProviderRepository]
+
+TENANT_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]+")
+
+# SQLite repositories hold little beyond the connection page cache
+SQLITE_RESIDENT_BYTES = 2 * 1024 * 1024
+
+
+class UnknownTenantError(KeyError):
+    pass
+
+
+class TenantRegistry:
+    """Lazily loads per-tenant provider repositories and keeps them in a memory-bounded LRU.
+
+    The default tenant uses default_path; other tenants are `<tenant_id>.db` (SQLite) or
+    `<tenant_id>.json` files in root. Resident size is estimated from the source file
+    (parsed JSON is roughly json_memory_factor times its size on disk).
+    """
+
+    def __init__(
+        self,
+        default_tenant: str,
+        default_path: Path,
+        root: Optional[Path] = None,
+        max_bytes: int = 512 * 1024 * 1024,
+        json_memory_factor: float = 12.0,
+    ):
+        self.default_tenant = default_tenant
+        self.default_path = Path(default_path)
+        self.root = Path(root) if root else None
+        self.max_bytes = max_bytes
+        self.json_memory_factor = json_memory_factor
+        self._resident: "OrderedDict[str, tuple[Repository, int]]" = OrderedDict()
+        self._resident_bytes = 0
+        self._lock = threading.Lock()
+        self._load_locks: Dict[str, threading.Lock] = {}
+        self.stats = {"hits": 0, "loads": 0, "evictions": 0}
+
+    def resolve(self, tenant_id: str) -> Optional[Path]:
+        if tenant_id == self.default_tenant:
+            return self.default_path
+        if self.root is None or not TENANT_ID_PATTERN.fullmatch(tenant_id):
+            return None
+        for suffix in (".db", ".json"):
+            path = self.root / f"{tenant_id}{suffix}"
+            if path.is_file():
+                return path
+        return None
+
+    def exists(self, tenant_id: str) -> bool:
+        return tenant_id in self._resident or self.resolve(tenant_id) is not None
+
+    def estimated_bytes(self, path: Path) -> int:
+        if path.suffix == ".db":
+            return SQLITE_RESIDENT_BYTES
+        return int(path.stat().st_size * self.json_memory_factor)
+
+    def get(self, tenant_id: Optional[str] = None) -> Repository:
+        tenant_id = tenant_id or self.default_tenant
+        with self._lock:
+            entry = self._resident.get(tenant_id)
+            if entry is not None:
+                self._resident.move_to_end(tenant_id)
+                self.stats["hits"] += 1
+                return entry[0]
+            load_lock = self._load_locks.setdefault(tenant_id, threading.Lock())
+
+        # Load outside the registry lock so a cold tenant doesn't stall hot ones
+        with load_lock:
+            with self._lock:
+                entry = self._resident.get(tenant_id)
+                if entry is not None:
+                    self._resident.move_to_end(tenant_id)
+                    self.stats["hits"] += 1
+                    return entry[0]
+            path = self.resolve(tenant_id)
+            if path is None:
+                raise UnknownTenantError(tenant_id)
+            if path.suffix == ".db":
+                repo: Repository = SQLiteProviderRepository(path)
+            else:
+                repo = ProviderRepository(path)
+            repo.load()
+            size = self.estimated_bytes(path)
+            logger.info(f"Loaded provider directory for tenant {tenant_id} ({path})")
+
+            with self._lock:
+                self._resident[tenant_id] = (repo, size)
+                self._resident_bytes += size
+                self.stats["loads"] += 1
+                self._evict(keep=tenant_id)
+                self._load_locks.pop(tenant_id, None)
+            return repo
+
+    def _evict(self, keep: str):
+        while self._resident_bytes > self.max_bytes and len(self._resident) > 1:
+            tenant_id = next(iter(self._resident))
+            if tenant_id == keep:
+                break
+            _, size = self._resident.pop(tenant_id)
+            self._resident_bytes -= size
+            self.stats["evictions"] += 1
+            logger.info(f"Evicted provider directory for tenant {tenant_id}")
+
+    def resident(self) -> Dict[str, int]:
+        with self._lock:
+            return {tenant_id: size for tenant_id, (_, size) in self._resident.items()}
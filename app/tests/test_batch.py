@@ -0,0 +1,91 @@
+import importlib
+import json
+import sys
+import types
+
+import pytest
+
+
+@pytest.fixture
+def batch(monkeypatch):
+    # Stand in for the agent graph so records can be processed without a model
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    agent = types.ModuleType("agent")
+    agent.end_session = lambda thread_id: None
+    agent.prefetch_referrals = lambda thread_id, data, tenant_id=None: False
+    agent.set_patient_context = lambda thread_id, data, reset=True, tenant_id=None: True
+    agent.run_message = lambda message, thread_id=None, deadline_seconds=None: {
+        "reply": f"echo: {message}"
+    }
+    monkeypatch.setitem(sys.modules, "agent", agent)
+    monkeypatch.delitem(sys.modules, "batch", raising=False)
+    return importlib.import_module("batch")
+
+
+def test_completed_lines_truncates_partial_record(batch, tmp_path):
+    output = tmp_path / "out.jsonl"
+    assert batch.completed_lines(output) == set()
+
+    complete = '{"line": 1, "reply": "a"}\n{"line": 3, "reply": "b"}\n'
+    output.write_text(complete + '{"line": 4, "re')
+    assert batch.completed_lines(output) == {1, 3}
+    assert output.read_text() == complete
+
+
+def test_read_records_skips_done_and_flags_malformed(batch, tmp_path):
+    lines = [
+        '{"patient_id": "1", "message": "done already"}',
+        "",
+        "not json",
+        "[1, 2]",
+        '"str"',
+        '{"patient_id": "2", "message": "hi"}',
+    ]
+    input_path = tmp_path / "in.jsonl"
+    input_path.write_text("\n".join(lines) + "\n")
+    assert list(batch.read_records(input_path, skip={1})) == [
+        (3, None),
+        (4, None),
+        (5, None),
+        (6, {"patient_id": "2", "message": "hi"}),
+    ]
+
+
+def test_process_record_bad_input(batch):
+    assert batch.process_record(7, None, None, 1.0) == {
+        "line": 7,
+        "error": "Malformed JSON record",
+    }
+
+    result = batch.process_record(2, {"id": "r2", "patient": {"id": 1}}, None, 1.0)
+    assert result["id"] == "r2"
+    assert result["error"].startswith("KeyError")
+
+    result = batch.process_record(
+        3, {"message": "hi", "patient": {"id": 1}, "tenant_id": "../x"}, None, 1.0
+    )
+    assert result["error"] == "ValueError: Unknown tenant_id"
+
+
+def test_process_record_reply(batch):
+    result = batch.process_record(
+        1, {"patient_id": "1", "message": "hi", "patient": {"id": 1}}, None, 1.0
+    )
+    assert result["id"] == 1
+    assert result["reply"] == "echo: hi"
+    assert "error" not in result
+
+
+def test_run_batch_writes_every_line(batch, tmp_path):
+    input_path = tmp_path / "in.jsonl"
+    output_path = tmp_path / "out.jsonl"
+    record = {"patient_id": "1", "message": "hi", "patient": {"id": 1}}
+    input_path.write_text(f'{json.dumps(record)}\n[1, 2]\n"str"\n')
+
+    stats = batch.run_batch(input_path, output_path, concurrency=2)
+    assert stats == {"ok": 1, "error": 2}
+    results = [json.loads(line) for line in output_path.read_text().splitlines()]
+    assert sorted(r["line"] for r in results) == [1, 2, 3]
+
+    # Resuming finds nothing left to do
+    assert batch.run_batch(input_path, output_path) == {"ok": 0, "error": 0}
@@ -0,0 +1,26 @@
+import importlib
+from pathlib import Path
+
+import pytest
+
+
+@pytest.fixture
+def config(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    return importlib.import_module("config")
+
+
+def test_relative_paths_resolve_against_app_dir(config, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    settings = config.Settings(TENANT_DIRECTORY_ROOT="tenants")
+    app_dir = Path(config.__file__).resolve().parent
+    assert settings.PROVIDER_DB_PATH == str(app_dir / "data" / "providers.db")
+    assert settings.LLM_CACHE_PATH == str(app_dir / "data" / "llm_cache.db")
+    assert settings.PROFILING_OUTPUT_DIR == str(app_dir / "profiles")
+    assert settings.TENANT_DIRECTORY_ROOT == str(app_dir / "tenants")
+
+
+def test_absolute_paths_are_kept(config, tmp_path):
+    settings = config.Settings(PROVIDER_DB_PATH=str(tmp_path / "providers.db"))
+    assert settings.PROVIDER_DB_PATH == str(tmp_path / "providers.db")
+    assert config.Settings().TENANT_DIRECTORY_ROOT is None
@@ -0,0 +1,139 @@
+import sqlite3
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from llm_cache import LLMResponseCache, cache_key, touches_tools
+
+TOOLS = [{"type": "function", "function": {"name": "book_appointment"}}]
+
+
+def conversation(call_id: str, message_id: str):
+    return [
+        SystemMessage(content="prompt"),
+        HumanMessage(content="Book an orthopedics appointment", id=message_id),
+        AIMessage(
+            content="",
+            tool_calls=[
+                {
+                    "name": "search_specialty",
+                    "args": {"specialty": "Orthopedics"},
+                    "id": call_id,
+                }
+            ],
+        ),
+        ToolMessage(content='{"providers": ["House, Gregory"]}', tool_call_id=call_id),
+    ]
+
+
+def key(messages, model="gpt-5-nano"):
+    return cache_key(model, 0.0, TOOLS, messages)
+
+
+def test_key_ignores_run_specific_ids():
+    assert key(conversation("call_a", "1")) == key(conversation("call_b", "2"))
+
+
+def test_key_depends_on_inputs():
+    base = conversation("call_a", "1")
+    assert key(base) != key(base, model="other")
+    assert key(base) != key(base[:2])
+    assert key(base) != cache_key("gpt-5-nano", 0.0, [], base)
+
+
+def test_touches_tools():
+    booking = AIMessage(
+        content="",
+        tool_calls=[{"name": "book_appointment", "args": {}, "id": "call_c"}],
+    )
+    after_booking = [
+        HumanMessage(content="Yes"),
+        booking,
+        ToolMessage(content="{}", tool_call_id="call_c"),
+    ]
+    assert touches_tools(after_booking, ["book_appointment"])
+    assert touches_tools([booking], ["book_appointment"])
+    assert not touches_tools(
+        after_booking + [HumanMessage(content="Thanks")], ["book_appointment"]
+    )
+    assert not touches_tools(conversation("call_a", "1"), ["book_appointment"])
+
+
+def test_get_put_roundtrip(tmp_path):
+    cache = LLMResponseCache(
+        tmp_path / "cache.db", max_bytes=1024 * 1024, ttl_seconds=60
+    )
+    assert cache.get("k") is None
+    cache.put("k", AIMessage(content="Hello!", id="run-1"), latency=1.5)
+    hit = cache.get("k")
+    assert hit.content == "Hello!"
+    assert hit.id is None
+    metrics = cache.metrics()
+    assert metrics["hits"] == 1 and metrics["misses"] == 1
+    assert metrics["hit_rate"] == 0.5
+    assert 0 < metrics["saved_seconds"] <= 1.5
+
+    # Entries persist across instances
+    reopened = LLMResponseCache(
+        tmp_path / "cache.db", max_bytes=1024 * 1024, ttl_seconds=60
+    )
+    assert reopened.get("k").content == "Hello!"
+    assert reopened.metrics()["size_bytes"] == metrics["size_bytes"]
+
+
+def test_ttl_expiry(tmp_path):
+    cache = LLMResponseCache(
+        tmp_path / "cache.db", max_bytes=1024 * 1024, ttl_seconds=0.01
+    )
+    cache.put("k", AIMessage(content="Hello!"), latency=1.0)
+    time.sleep(0.02)
+    assert cache.get("k") is None
+    assert cache.metrics()["entries"] == 0
+
+
+def test_size_eviction(tmp_path):
+    message = AIMessage(content="x" * 500)
+    cache = LLMResponseCache(tmp_path / "cache.db", max_bytes=2500, ttl_seconds=60)
+    for i in range(3):
+        cache.put(f"k{i}", message, latency=1.0)
+        time.sleep(0.001)
+    cache.get("k0")
+    time.sleep(0.001)
+    cache.put("k3", message, latency=1.0)
+    metrics = cache.metrics()
+    assert metrics["size_bytes"] <= 2500
+    assert metrics["evictions"] >= 1
+    # k0 was touched most recently among the originals, so it survives
+    assert cache.get("k0") is not None
+    assert cache.get("k1") is None
+
+
+def test_eviction_counts_entries_from_other_processes(tmp_path):
+    message = AIMessage(content="x" * 500)
+    server = LLMResponseCache(tmp_path / "cache.db", max_bytes=2500, ttl_seconds=60)
+    worker = LLMResponseCache(tmp_path / "cache.db", max_bytes=2500, ttl_seconds=60)
+    for i in range(3):
+        server.put(f"server{i}", message, latency=1.0)
+        worker.put(f"worker{i}", message, latency=1.0)
+    assert server.metrics()["size_bytes"] <= 2500
+    assert worker.metrics()["size_bytes"] <= 2500
+    assert server.stats["evictions"] + worker.stats["evictions"] >= 1
+
+
+class LockedConnection:
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise sqlite3.OperationalError("database is locked")
+
+        return fail
+
+
+def test_storage_errors_are_not_raised(tmp_path):
+    cache = LLMResponseCache(
+        tmp_path / "cache.db", max_bytes=1024 * 1024, ttl_seconds=60
+    )
+    cache._conn = LockedConnection()
+    assert cache.get("k") is None
+    cache.put("k", AIMessage(content="hi"), latency=1.0)
+    assert cache.stats["errors"] == 2
+    assert cache.stats["hits"] == cache.stats["stores"] == 0
@@ -0,0 +1,83 @@
+import time
+
+import httpx
+import openai
+import pytest
+
+from llm_client import RetryBudget, capped_timeout, invoke_with_retries
+
+TIMEOUT = httpx.Timeout(connect=3.0, read=60.0, write=60.0, pool=3.0)
+
+
+def flaky(failures: int):
+    calls = []
+
+    def call(timeout):
+        calls.append(timeout)
+        if len(calls) <= failures:
+            raise openai.APIConnectionError(request=httpx.Request("POST", "http://llm"))
+        return "ok"
+
+    return call, calls
+
+
+def retry(call, budget=None, max_retries=2, deadline=None):
+    return invoke_with_retries(
+        call,
+        TIMEOUT,
+        budget or RetryBudget(),
+        max_retries=max_retries,
+        backoff_base=0.001,
+        backoff_max=0.001,
+        deadline=deadline,
+    )
+
+
+def test_retries_transient_errors():
+    call, calls = flaky(2)
+    assert retry(call) == "ok"
+    assert len(calls) == 3
+    assert calls[0] is TIMEOUT
+
+
+def test_gives_up_after_max_retries():
+    call, calls = flaky(3)
+    with pytest.raises(openai.APIConnectionError):
+        retry(call)
+    assert len(calls) == 3
+
+
+def test_does_not_retry_other_errors():
+    calls = []
+
+    def call(timeout):
+        calls.append(timeout)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        retry(call)
+    assert len(calls) == 1
+
+
+def test_retry_budget_exhausted():
+    budget = RetryBudget(ratio=0.0, max_tokens=1.0)
+    call, calls = flaky(1)
+    assert retry(call, budget=budget) == "ok"
+    call, calls = flaky(1)
+    with pytest.raises(openai.APIConnectionError):
+        retry(call, budget=budget)
+    assert len(calls) == 1
+
+
+def test_deadline_caps_timeouts():
+    call, calls = flaky(0)
+    retry(call, deadline=time.monotonic() + 5.0)
+    assert calls[0].read <= 5.0
+    assert calls[0].connect <= 3.0
+    with pytest.raises(TimeoutError):
+        retry(call, deadline=time.monotonic() - 1.0)
+
+
+def test_capped_timeout():
+    t = capped_timeout(TIMEOUT, 10.0)
+    assert (t.connect, t.read, t.write, t.pool) == (3.0, 10.0, 10.0, 3.0)
@@ -0,0 +1,109 @@
+import threading
+import time
+from datetime import date
+
+import pytest
+
+import prefetch
+from provider_repository import ProviderRepository
+
+REFERRALS = [
+    {"provider": "House, Gregory MD", "specialty": "Orthopedics"},
+    {"specialty": "Primary Care"},
+]
+
+
+@pytest.fixture(scope="module")
+def repo() -> ProviderRepository:
+    r = ProviderRepository()
+    r.load()
+    return r
+
+
+def test_upcoming_dates():
+    # 2024-01-01 is a Monday; horizon starts the following day
+    dates = prefetch.upcoming_dates(["Monday", "Friday"], date(2024, 1, 1), 14)
+    assert dates == ["2024-01-05", "2024-01-08", "2024-01-12", "2024-01-15"]
+
+
+def test_resolve_referrals(repo: ProviderRepository):
+    result = prefetch.resolve_referrals(repo, REFERRALS, start=date(2024, 1, 1))
+    assert result["as_of"] == "2024-01-01"
+    house, primary = result["referrals"]
+
+    assert house["provider"] == "House, Gregory"
+    assert house["specialty"] == "Orthopedics"
+    locations = {a["location"] for a in house["availability"]}
+    assert {"PPTH Orthopedics", "Jefferson Hospital"}.issubset(locations)
+    for a in house["availability"]:
+        assert a["upcoming_dates"]
+
+    assert primary["specialty"] == "Primary Care"
+    assert any(a["provider"] == "Grey, Meredith" for a in primary["availability"])
+
+
+class SlowRepository:
+    """Delegates to a real repository after a delay, to keep a prefetch in flight."""
+
+    def __init__(self, repo: ProviderRepository, delay: float):
+        self.repo = repo
+        self.delay = delay
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            time.sleep(self.delay)
+            return getattr(self.repo, name)(*args, **kwargs)
+
+        return call
+
+
+def test_schedule_delivers_result(repo: ProviderRepository):
+    ready = threading.Event()
+    results = []
+
+    def on_ready(result):
+        results.append(result)
+        ready.set()
+
+    assert prefetch.schedule(
+        "thread-1", repo, {"referred_providers": REFERRALS}, on_ready
+    )
+    assert ready.wait(timeout=5)
+    assert len(results[0]["referrals"]) == 2
+    # Nothing is kept once the result has been handed over
+    assert prefetch.collect("thread-1") is None
+
+
+def test_collect_takes_over_in_flight_prefetch(repo: ProviderRepository):
+    results = []
+    data = {"referred_providers": REFERRALS}
+    assert prefetch.schedule(
+        "thread-2", SlowRepository(repo, 0.1), data, results.append
+    )
+    result = prefetch.collect("thread-2", timeout=5)
+    assert result is not None
+    assert len(result["referrals"]) == 2
+    assert prefetch.collect("thread-2") is None
+    time.sleep(0.1)
+    assert results == []
+
+
+def test_discard_drops_in_flight_prefetch(repo: ProviderRepository):
+    results = []
+    data = {"referred_providers": REFERRALS}
+    assert prefetch.schedule(
+        "thread-3", SlowRepository(repo, 0.05), data, results.append
+    )
+    prefetch.discard("thread-3")
+    time.sleep(0.3)
+    assert results == []
+    assert prefetch.collect("thread-3") is None
+
+
+def test_schedule_without_referrals(repo: ProviderRepository):
+    results = []
+    assert not prefetch.schedule(
+        "thread-4", repo, {"referred_providers": []}, results.append
+    )
+    assert prefetch.collect("thread-4") is None
+    assert results == []
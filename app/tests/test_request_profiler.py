@@ -0,0 +1,108 @@
+import contextvars
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import request_profiler
+
+
+def busy_loop(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_should_profile():
+    assert request_profiler.should_profile("secret", "secret", 0.0)
+    assert not request_profiler.should_profile("wrong", "secret", 0.0)
+    assert not request_profiler.should_profile(None, None, 0.0)
+    assert request_profiler.should_profile(None, None, 1.0)
+
+
+def test_token_matches():
+    assert request_profiler.token_matches("secret", "secret")
+    assert request_profiler.token_matches("sécret", "sécret")
+    assert not request_profiler.token_matches("secret", "Secret")
+    assert not request_profiler.token_matches(None, "secret")
+    assert not request_profiler.token_matches("", "")
+
+
+def test_profile_writes_collapsed_capture(tmp_path):
+    with request_profiler.profile("test", True, tmp_path, interval=0.001):
+        busy_loop(0.1)
+    captures = request_profiler.list_captures(tmp_path)
+    assert len(captures) == 1
+    path = request_profiler.capture_path(tmp_path, captures[0]["name"])
+    lines = path.read_text().splitlines()
+    assert any("busy_loop (test_request_profiler.py:" in line for line in lines)
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+
+
+def other_request(seconds: float):
+    busy_loop(seconds)
+
+
+@request_profiler.profiled_thread()
+def worker(seconds: float):
+    busy_loop(seconds)
+
+
+def capture_lines(output_dir):
+    captures = request_profiler.list_captures(output_dir)
+    assert len(captures) == 1
+    path = request_profiler.capture_path(output_dir, captures[0]["name"])
+    return path.read_text().splitlines()
+
+
+def test_profile_excludes_concurrent_requests(tmp_path):
+    running = threading.Event()
+    done = threading.Event()
+
+    def unprofiled():
+        running.set()
+        while not done.is_set():
+            other_request(0.01)
+
+    thread = threading.Thread(target=unprofiled)
+    thread.start()
+    running.wait()
+    with request_profiler.profile("test", True, tmp_path, interval=0.001):
+        busy_loop(0.1)
+    done.set()
+    thread.join()
+    lines = capture_lines(tmp_path)
+    assert any("busy_loop" in line for line in lines)
+    assert not any("other_request" in line for line in lines)
+
+
+def test_profile_includes_registered_worker_threads(tmp_path):
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        with request_profiler.profile("test", True, tmp_path, interval=0.001):
+            pool.submit(contextvars.copy_context().run, worker, 0.1).result()
+        # Outside the block the worker is no longer attributed to the request
+        pool.submit(contextvars.copy_context().run, worker, 0.01).result()
+    lines = capture_lines(tmp_path)
+    assert any("worker (test_request_profiler.py:" in line for line in lines)
+
+
+def test_write_capture_prunes_oldest(tmp_path):
+    for i in range(3):
+        (tmp_path / f"20240101T00000{i}-old{request_profiler.CAPTURE_SUFFIX}").touch()
+    samples = Counter({"thread;main": 1})
+    path = request_profiler.write_capture(tmp_path, "new", samples, max_captures=2)
+    names = [c["name"] for c in request_profiler.list_captures(tmp_path)]
+    assert names == [path.name, f"20240101T000002-old{request_profiler.CAPTURE_SUFFIX}"]
+
+
+def test_profile_disabled(tmp_path):
+    with request_profiler.profile("test", False, tmp_path):
+        busy_loop(0.01)
+    assert request_profiler.list_captures(tmp_path) == []
+
+
+def test_capture_path_rejects_traversal(tmp_path):
+    assert request_profiler.capture_path(tmp_path, "../secret.collapsed") is None
+    assert request_profiler.capture_path(tmp_path, "missing.collapsed") is None
@@ -0,0 +1,85 @@
+import pytest
+
+from provider_repository import ProviderRepository
+from sqlite_provider_repository import SQLiteProviderRepository, import_json
+
+
+@pytest.fixture(scope="module")
+def json_repo() -> ProviderRepository:
+    r = ProviderRepository()
+    r.load()
+    return r
+
+
+@pytest.fixture(scope="module")
+def repo(tmp_path_factory, json_repo: ProviderRepository) -> SQLiteProviderRepository:
+    db_path = tmp_path_factory.mktemp("db") / "providers.db"
+    count = import_json(json_repo.json_path, db_path)
+    assert count == len(json_repo.providers)
+    r = SQLiteProviderRepository(db_path)
+    r.load()
+    return r
+
+
+def test_load_missing_database(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        SQLiteProviderRepository(tmp_path / "missing.db").load()
+
+
+def test_search_by_specialty(repo, json_repo):
+    for specialty in ("Primary Care", "orthopedics", "Surgery", "Dermatology"):
+        assert repo.search_by_specialty(specialty) == json_repo.search_by_specialty(
+            specialty
+        )
+
+
+def test_search_by_name_exact(repo):
+    p = repo.search_by_name("House, Gregory")
+    assert p is not None
+    assert p.name == "House, Gregory"
+    assert p.specialty == "Orthopedics"
+    assert [d.name for d in p.departments] == ["PPTH Orthopedics", "Jefferson Hospital"]
+
+
+def test_search_by_name_fuzzy(repo):
+    assert repo.search_by_name("Dr. Meridith Gray").name == "Grey, Meredith"
+    assert repo.search_by_name("House, Gregory MD").name == "House, Gregory"
+    assert repo.search_by_name("zz") is None
+
+
+@pytest.mark.parametrize(
+    "method, args",
+    [
+        ("get_provider_availability", ("House, Gregory",)),
+        ("get_provider_availability", ("Dr. Meridith Gray",)),
+        ("get_specialty_availability", ("Primary Care",)),
+        ("get_provider_availability_on_day", ("Brennan, Temperance", "Tuesday")),
+        ("get_specialty_availability_on_day", ("Orthopedics", "Wednesday")),
+    ],
+)
+def test_matches_json_backend(repo, json_repo, method, args):
+    assert getattr(repo, method)(*args) == getattr(json_repo, method)(*args)
+
+
+def test_import_replaces_existing_database(tmp_path, json_repo):
+    db_path = tmp_path / "providers.db"
+    db_path.write_text("stale")
+    import_json(json_repo.json_path, db_path)
+    r = SQLiteProviderRepository(db_path)
+    r.load()
+    assert r.search_by_name("House, Gregory") is not None
+    assert [p.name for p in tmp_path.iterdir()] == ["providers.db"]
+
+
+def test_import_swapped_arguments_keeps_input(tmp_path, json_repo):
+    db_path = tmp_path / "providers.db"
+    import_json(json_repo.json_path, db_path)
+    json_copy = tmp_path / "providers.json"
+    json_copy.write_bytes(json_repo.json_path.read_bytes())
+    with pytest.raises(ValueError):
+        import_json(db_path, json_copy)
+    assert json_copy.read_bytes() == json_repo.json_path.read_bytes()
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "providers.db",
+        "providers.json",
+    ]
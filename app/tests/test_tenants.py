@@ -0,0 +1,64 @@
+import shutil
+from pathlib import Path
+
+import pytest
+
+from provider_repository import ProviderRepository
+from sqlite_provider_repository import SQLiteProviderRepository, import_json
+from tenants import TenantRegistry, UnknownTenantError
+
+PROVIDERS_JSON = Path(__file__).resolve().parents[1] / "data" / "providers.json"
+
+
+@pytest.fixture
+def root(tmp_path: Path) -> Path:
+    for tenant_id in ("alpha", "beta", "gamma"):
+        shutil.copy(PROVIDERS_JSON, tmp_path / f"{tenant_id}.json")
+    import_json(PROVIDERS_JSON, tmp_path / "delta.db")
+    return tmp_path
+
+
+def make_registry(root: Path, max_tenants: int = 10) -> TenantRegistry:
+    # Budget sized in units of one tenant's estimated footprint
+    per_tenant = int(PROVIDERS_JSON.stat().st_size * 12.0)
+    return TenantRegistry(
+        default_tenant="default",
+        default_path=PROVIDERS_JSON,
+        root=root,
+        max_bytes=per_tenant * max_tenants,
+    )
+
+
+def test_lazy_load_and_hits(root: Path):
+    registry = make_registry(root)
+    assert registry.resident() == {}
+    repo = registry.get("alpha")
+    assert isinstance(repo, ProviderRepository)
+    assert registry.get("alpha") is repo
+    assert registry.stats == {"hits": 1, "loads": 1, "evictions": 0}
+    assert registry.get(None) is registry.get("default")
+
+
+def test_sqlite_tenant(root: Path):
+    repo = make_registry(root).get("delta")
+    assert isinstance(repo, SQLiteProviderRepository)
+    assert repo.search_by_name("House, Gregory").specialty == "Orthopedics"
+
+
+def test_lru_eviction(root: Path):
+    registry = make_registry(root, max_tenants=2)
+    registry.get("alpha")
+    registry.get("beta")
+    registry.get("alpha")
+    registry.get("gamma")
+    # beta was least recently used
+    assert list(registry.resident()) == ["alpha", "gamma"]
+    assert registry.stats["evictions"] == 1
+
+
+def test_unknown_tenant(root: Path):
+    registry = make_registry(root)
+    assert not registry.exists("missing")
+    assert not registry.exists("../alpha")
+    with pytest.raises(UnknownTenantError):
+        registry.get("missing")
@@ -1,54 +1,78 @@
 import json
 import logging
 from datetime import datetime
+from pathlib import Path
 from typing import Literal
 
+from config import settings
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
-from provider_repository import ProviderRepository
+from request_profiler import profiled_thread
+from tenants import TenantRegistry
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-repo = ProviderRepository()
-repo.load()
+if settings.PROVIDER_BACKEND == "sqlite":
+    default_path = Path(settings.PROVIDER_DB_PATH)
+else:
+    default_path = Path(__file__).parent / "data" / "providers.json"
+
+registry = TenantRegistry(
+    default_tenant=settings.DEFAULT_TENANT,
+    default_path=default_path,
+    root=settings.TENANT_DIRECTORY_ROOT,
+    max_bytes=settings.TENANT_CACHE_MAX_MB * 1024 * 1024,
+    json_memory_factor=settings.TENANT_JSON_MEMORY_FACTOR,
+)
+registry.get(settings.DEFAULT_TENANT)
+
+
+def repo_for(config: RunnableConfig):
+    """Provider repository for the tenant bound to the current graph run."""
+    return registry.get(config.get("configurable", {}).get("tenant_id"))
 
 
 def make_tools():
     @tool("get_provider_info")
-    def get_provider_info(name: str) -> str:
+    @profiled_thread()
+    def get_provider_info(name: str, config: RunnableConfig) -> str:
         """Find provider by exact name (e.g., 'Grey, Meredith', 'House, Gregory'). Returns JSON string."""
         logger.info(f"Tool call: get_provider_info(name='{name}')")
-        provider = repo.search_by_name(name)
+        provider = repo_for(config).search_by_name(name)
         if not provider:
             return json.dumps({"error": f"Provider '{name}' not found"})
         logger.info(f"Found provider '{name}'")
         return json.dumps({"provider": provider})
 
     @tool("search_specialty")
-    def search_specialty(specialty: str) -> str:
+    @profiled_thread()
+    def search_specialty(specialty: str, config: RunnableConfig) -> str:
         """Find providers by exact specialty (e.g., 'Orthopedics', 'Primary Care', 'Surgery'). Returns JSON string."""
         logger.info(f"Tool call: search_specialty(specialty='{specialty}')")
-        providers = repo.search_by_specialty(specialty)
+        providers = repo_for(config).search_by_specialty(specialty)
         logger.info(f"Found {len(providers)} providers for specialty '{specialty}'")
         return json.dumps({"providers": [item.name for item in providers]})
 
     @tool("provider_availability")
-    def provider_availability(provider_name: str) -> str:
+    @profiled_thread()
+    def provider_availability(provider_name: str, config: RunnableConfig) -> str:
         """Get all availability information for a given provider by exact name (e.g., 'Grey, Meredith'). Returns JSON string."""
         logger.info(
             f"Tool call: provider_availability(provider_name='{provider_name}')"
         )
-        availability = repo.get_provider_availability(provider_name)
+        availability = repo_for(config).get_provider_availability(provider_name)
         logger.info(
             f"Found {len(availability)} availability windows for {provider_name}"
         )
         return json.dumps({"provider": provider_name, "availability": availability})
 
     @tool("specialty_availability")
-    def specialty_availability(specialty: str) -> str:
+    @profiled_thread()
+    def specialty_availability(specialty: str, config: RunnableConfig) -> str:
         """Get all availability information for all providers of a given exact specialty (e.g., 'Orthopedics', 'Primary Care'). Returns JSON string."""
         logger.info(f"Tool call: specialty_availability(specialty='{specialty}')")
-        availability = repo.get_specialty_availability(specialty)
+        availability = repo_for(config).get_specialty_availability(specialty)
         logger.info(f"Found {len(availability)} availability windows for {specialty}")
         return json.dumps({"specialty": specialty, "availability": availability})
 
@@ -80,12 +104,14 @@ def make_tools():
         return "Self-pay rates: Primary Care: $150, Orthopedics: $300, Surgery: $1000"
 
     @tool("book_appointment")
+    @profiled_thread()
     def book_appointment(
         patient_name: str,
         provider_name: str,
         location: str,
         date: str,
         time: str,
+        config: RunnableConfig,
         appointment_type: Literal["NEW", "ESTABLISHED"] = None,
     ) -> str:
         """Book an appointment (only called once user confirms proposed appointment details given by system)"""
@@ -95,7 +121,7 @@ def make_tools():
         try:
 
             # Validate provider name
-            p = repo.search_by_name(provider_name)
+            p = repo_for(config).search_by_name(provider_name)
             if not p:
                 return json.dumps({"success": False, "error": "Provider not found, please try again"})
 